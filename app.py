@@ -2,10 +2,13 @@ import streamlit as st
 import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 import os
+import shutil
 
 # Page config
 st.set_page_config(
@@ -27,25 +30,122 @@ def init_spotify():
 def get_playlist_id(url):
     return url.split("/")[-1].split("?")[0]
 
-# Load historical data from CSV
-def load_historical_data():
-    if os.path.exists("playlist_history.csv"):
-        return pd.read_csv("playlist_history.csv", parse_dates=['date'])
-    return pd.DataFrame(columns=['date', 'saves', 'total_tracks', 'avg_popularity'])
+# History is stored as one Parquet file per day inside the open period's
+# directory; once a period is over its daily files are compacted into one file
+HISTORY_DIR = "playlist_history"  # Compacted per year
+TRACK_HISTORY_DIR = "track_popularity_history"  # Compacted per month
+HISTORY_PERIOD = 4  # Length of the YYYY prefix of an ISO date
+TRACK_HISTORY_PERIOD = 7  # Length of the YYYY-MM prefix of an ISO date
+LEGACY_HISTORY_FILE = "playlist_history.csv"
+LEGACY_TRACK_HISTORY_FILE = "track_popularity_history.csv"
+HISTORY_DTYPES = {
+    'date': 'datetime64[ns]',
+    'saves': 'int32',
+    'total_tracks': 'int16',
+    'avg_popularity': 'float32'
+}
+TRACK_HISTORY_DTYPES = {
+    'date': 'datetime64[ns]',
+    'track_id': 'object',
+    'name': 'object',
+    'artist': 'object',
+    'popularity': 'int8'
+}
 
-# Save historical data to CSV
-def save_historical_data(df):
-    df.to_csv("playlist_history.csv", index=False)
+# Latest modification time of a history directory and its period entries,
+# used as a cache key for the loaders
+def get_mtime(path):
+    if not os.path.exists(path):
+        return 0.0
+    entries = [os.path.join(path, entry) for entry in os.listdir(path)] if os.path.isdir(path) else []
+    return max(os.path.getmtime(entry) for entry in [path] + entries)
 
-# Load track popularity history
-def load_track_history():
-    if os.path.exists("track_popularity_history.csv"):
-        return pd.read_csv("track_popularity_history.csv", parse_dates=['date'])
-    return pd.DataFrame(columns=['date', 'track_id', 'track_name', 'artist', 'popularity'])
+# Path of the daily Parquet file for a day of a history dataset
+def get_day_path(directory, period, day):
+    return os.path.join(directory, day[:period], f"{day}.parquet")
 
-# Save track popularity history
-def save_track_history(df):
-    df.to_csv("track_popularity_history.csv", index=False)
+# Write a history frame to Parquet, replacing any previous file in one step.
+# The temporary name starts with a dot so directory reads skip it.
+def write_history(df, path, dtypes):
+    directory, filename = os.path.split(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f".{filename}.tmp")
+    df[list(dtypes)].astype(dtypes).to_parquet(tmp_path, compression="zstd", index=False)
+    os.replace(tmp_path, path)
+
+# Read a Parquet history file, or every file under a history directory
+def read_history(path, dtypes):
+    if os.path.isfile(path) or (os.path.isdir(path) and os.listdir(path)):
+        return pd.read_parquet(path)
+    return pd.DataFrame(columns=list(dtypes)).astype(dtypes)
+
+# Merge the daily files of every finished period into a single file per period.
+# Daily rows win over rows already in the period file for the same date.
+def compact_history(directory, period, today, dtypes):
+    if not os.path.isdir(directory):
+        return
+    for entry in os.listdir(directory):
+        period_dir = os.path.join(directory, entry)
+        if not os.path.isdir(period_dir) or entry == today[:period]:
+            continue
+        daily_df = read_history(period_dir, dtypes)
+        period_path = os.path.join(directory, f"{entry}.parquet")
+        period_df = read_history(period_path, dtypes)
+        period_df = period_df[~period_df['date'].isin(daily_df['date'])]
+        write_history(pd.concat([period_df, daily_df], ignore_index=True), period_path, dtypes)
+        shutil.rmtree(period_dir)
+
+# Import the old CSV history files into the Parquet history. Days already in
+# Parquet are kept, and each CSV is renamed to *.csv.bak only once all of its
+# days are written, so an interrupted migration is retried on the next run.
+def migrate_csv_history():
+    for csv_path, directory, period, dtypes in [
+        (LEGACY_TRACK_HISTORY_FILE, TRACK_HISTORY_DIR, TRACK_HISTORY_PERIOD, TRACK_HISTORY_DTYPES),
+        (LEGACY_HISTORY_FILE, HISTORY_DIR, HISTORY_PERIOD, HISTORY_DTYPES)
+    ]:
+        if not os.path.exists(csv_path):
+            continue
+        legacy_df = pd.read_csv(csv_path, parse_dates=['date'])
+        stored_dates = set(read_history(directory, dtypes)['date'])
+        for day, day_df in legacy_df.groupby('date'):
+            if day not in stored_dates:
+                write_history(day_df, get_day_path(directory, period, day.date().isoformat()), dtypes)
+        os.replace(csv_path, f"{csv_path}.bak")
+
+# Load historical data (cached until a file is added, replaced or compacted)
+@st.cache_data(show_spinner=False, max_entries=1)
+def load_historical_data(mtime):
+    return read_history(HISTORY_DIR, HISTORY_DTYPES)
+
+# Save one day of playlist statistics
+def save_historical_data(day, df):
+    write_history(df, get_day_path(HISTORY_DIR, HISTORY_PERIOD, day), HISTORY_DTYPES)
+
+# Load track popularity history (cached until a file is added, replaced or compacted)
+@st.cache_data(show_spinner=False, max_entries=1)
+def load_track_history(mtime):
+    return read_history(TRACK_HISTORY_DIR, TRACK_HISTORY_DTYPES)
+
+# Save one day of track popularity data
+def save_track_history(day, df):
+    write_history(df, get_day_path(TRACK_HISTORY_DIR, TRACK_HISTORY_PERIOD, day), TRACK_HISTORY_DTYPES)
+
+MAX_PLOT_POINTS = 500  # Upper bound on points sent to the browser per trace
+
+PAGE_SIZE = 100  # Maximum page size for the playlist items endpoint
+
+# Top tracks by popularity
+def get_top_tracks(tracks_df, n=20):
+    return tracks_df.nlargest(n, 'popularity')
+
+# Artists with most tracks
+def get_artist_counts(tracks_df, n=15):
+    return tracks_df['artist'].value_counts().head(n)
+
+# Number of tracks per release year, ignoring unknown years
+def get_year_counts(release_years):
+    return release_years.dropna().value_counts().sort_index()
 
 # Get playlist data - Fixed caching issue
 @st.cache_data(ttl=3600)  # Cache for 1 hour
@@ -53,64 +153,430 @@ def get_playlist_data(_sp, playlist_id):
     playlist = _sp.playlist(playlist_id)
     
     # Get all tracks (handle playlists with more than 100 tracks)
-    tracks = []
-    results = _sp.playlist_tracks(playlist_id)
-    tracks.extend(results['items'])
+    def fetch_page(offset):
+        return _sp.playlist_items(playlist_id, offset=offset, limit=PAGE_SIZE, additional_types=('track',))
     
-    while results['next']:
-        results = _sp.next(results)
-        tracks.extend(results['items'])
+    results = fetch_page(0)
+    tracks = list(results['items'])
     
-    # Extract track information
-    track_data = []
+    # Fetch the remaining pages concurrently, keeping them in offset order
+    offsets = range(PAGE_SIZE, results['total'], PAGE_SIZE)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for page in executor.map(fetch_page, offsets):
+            tracks.extend(page['items'])
+    
+    # Skip deleted/local tracks (no track or id) and tracks listed more than once
+    seen = set()
+    items = []
     for item in tracks:
-        track = item['track']
-        if track:  # Check if track exists (not deleted)
-            track_data.append({
-                'track_id': track['id'],
-                'name': track['name'],
-                'artist': ', '.join([artist['name'] for artist in track['artists']]),
-                'album': track['album']['name'],
-                'popularity': track['popularity'],
-                'duration_ms': track['duration_ms'],
-                'release_date': track['album']['release_date'],
-                'preview_url': track['preview_url'],
-                'external_url': track['external_urls']['spotify']
-            })
-    
-    return playlist, pd.DataFrame(track_data)
+        track = item.get('track')
+        if track and track.get('id') and track['id'] not in seen:
+            seen.add(track['id'])
+            items.append(track)
+    
+    # Extract track information column-wise
+    df = pd.DataFrame({
+        'track_id': [track['id'] for track in items],
+        'name': [track['name'] for track in items],
+        'artist': [', '.join(artist['name'] for artist in track['artists']) for track in items],
+        'album': [track['album']['name'] for track in items],
+        'popularity': [track['popularity'] for track in items],
+        'duration_ms': [track['duration_ms'] for track in items],
+        'release_date': [track['album']['release_date'] for track in items],
+        'preview_url': [track['preview_url'] for track in items],
+        'external_url': [track['external_urls']['spotify'] for track in items]
+    })
+    
+    # Lower-cased "name ¦ artist" text so searches need a single substring pass
+    df['_search'] = (df['name'] + ' ¦ ' + df['artist']).str.lower()
+    
+    # Use compact dtypes: popularity is 0-100, durations fit in 32 bits
+    df = df.astype({
+        'popularity': 'int8',
+        'duration_ms': 'int32',
+        'artist': 'category',
+        'album': 'category'
+    })
+    
+    # Derived columns, computed once here so the tabs only read them
+    df['duration_min'] = (df['duration_ms'].to_numpy() / 60000).astype('float32')
+    # Release dates are YYYY, YYYY-MM or YYYY-MM-DD, so the year is always the first 4 characters
+    df['release_year'] = pd.to_numeric(df['release_date'].str[:4], errors='coerce').astype('Int16')
+    
+    # Aggregations used by the tabs, cached along with the tracks
+    track_stats = {
+        'top_tracks': get_top_tracks(df),
+        'artist_counts': get_artist_counts(df),
+        'year_counts': get_year_counts(df['release_year'])
+    }
+    
+    return playlist, df, track_stats
 
 # Update daily statistics
 def update_daily_stats(playlist_info, tracks_df):
-    today = pd.Timestamp.now().normalize()
+    today = date.today().isoformat()
     
-    # Load existing data
-    hist_df = load_historical_data()
-    track_hist_df = load_track_history()
+    migrate_csv_history()
+    compact_history(HISTORY_DIR, HISTORY_PERIOD, today, HISTORY_DTYPES)
+    compact_history(TRACK_HISTORY_DIR, TRACK_HISTORY_PERIOD, today, TRACK_HISTORY_DTYPES)
     
     # Check if today's data already exists
-    if not hist_df.empty and today in hist_df['date'].values:
-        return hist_df, track_hist_df
+    if os.path.exists(get_day_path(HISTORY_DIR, HISTORY_PERIOD, today)):
+        return
+    
+    # Add today's track popularity data
+    today_tracks = tracks_df[['track_id', 'name', 'artist', 'popularity']].assign(date=pd.Timestamp(today))
+    save_track_history(today, today_tracks)
     
-    # Add today's playlist statistics
-    new_row = pd.DataFrame([{
-        'date': today,
+    # Add today's playlist statistics last, as it marks the day as logged
+    save_historical_data(today, pd.DataFrame([{
+        'date': pd.Timestamp(today),
         'saves': playlist_info['followers']['total'],
         'total_tracks': len(tracks_df),
         'avg_popularity': tracks_df['popularity'].mean()
-    }])
+    }]))
+
+# Daily save growth and growth rate (%) computed in a single pass over the saves
+def compute_growth(saves):
+    saves = np.asarray(saves, dtype='float64')
+    previous = np.concatenate((saves[:1], saves[:-1]))
+    growth = saves - previous
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = growth / previous * 100
+    return growth, np.where(np.isnan(rate), 0.0, rate)
+
+# Evenly thin out rows to about max_points, always keeping the newest row
+def downsample(df, max_points=MAX_PLOT_POINTS):
+    stride = max(1, -(-len(df) // max_points))  # ceiling division
+    positions = np.arange(0, len(df), stride)
+    if len(df) and positions[-1] != len(df) - 1:
+        positions = np.append(positions, len(df) - 1)
+    return df.iloc[positions]
+
+# Per-day track count and average popularity (cached until a new day is written)
+@st.cache_data(show_spinner=False, max_entries=1)
+def get_track_summary(mtime):
+    return load_track_history(mtime).groupby('date').agg({
+        'track_id': 'count',
+        'popularity': 'mean'
+    }).rename(columns={'track_id': 'tracks_count', 'popularity': 'avg_popularity'})
+
+# Playlist history as CSV text for download (cached until the history changes)
+@st.cache_data(show_spinner=False, max_entries=1)
+def get_history_csv(mtime):
+    return load_historical_data(mtime).to_csv(index=False)
+
+# Track popularity history as CSV text for download (cached until the history changes)
+@st.cache_data(show_spinner=False, max_entries=1)
+def get_track_history_csv(mtime):
+    return load_track_history(mtime).to_csv(index=False)
+
+# Growth tracking tab
+@st.fragment
+def render_growth_tab(playlist_info):
+    st.header("Playlist Growth Over Time")
+    hist_df = load_historical_data(get_mtime(HISTORY_DIR))
     
-    hist_df = pd.concat([hist_df, new_row], ignore_index=True)
-    save_historical_data(hist_df)
+    if len(hist_df) > 1:
+        # Calculate daily changes
+        hist_df = hist_df.sort_values('date')
+        hist_df['daily_growth'], hist_df['growth_rate'] = compute_growth(hist_df['saves'].to_numpy())
+        plot_df = downsample(hist_df).copy()
+        # Growth between plotted points, so each bar covers the gap it spans
+        plot_df['period_growth'], _ = compute_growth(plot_df['saves'].to_numpy())
+        
+        # Create subplots
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Line chart for saves
+            fig_saves = go.Figure()
+            fig_saves.add_trace(go.Scatter(
+                x=plot_df['date'],
+                y=plot_df['saves'],
+                mode='lines+markers',
+                name='Total Saves',
+                line=dict(color='#1DB954', width=3),
+                marker=dict(size=8)
+            ))
+            
+            fig_saves.update_layout(
+                title="Total Playlist Saves",
+                xaxis_title="Date",
+                yaxis_title="Total Saves",
+                hovermode='x unified',
+                height=400
+            )
+            
+            st.plotly_chart(fig_saves, use_container_width=True)
+        
+        with col2:
+            # Bar chart for daily growth
+            fig_growth = go.Figure()
+            fig_growth.add_trace(go.Bar(
+                x=plot_df['date'],
+                y=plot_df['period_growth'],
+                name='Daily Growth',
+                marker_color=np.where(plot_df['period_growth'].to_numpy() >= 0, '#1DB954', '#FF6B6B')
+            ))
+            
+            fig_growth.update_layout(
+                title="Daily Save Growth" if len(plot_df) == len(hist_df) else "Save Growth per Period",
+                xaxis_title="Date",
+                yaxis_title="New Saves",
+                height=400
+            )
+            
+            st.plotly_chart(fig_growth, use_container_width=True)
+        
+        # Average popularity over time
+        fig_pop = go.Figure()
+        fig_pop.add_trace(go.Scatter(
+            x=plot_df['date'],
+            y=plot_df['avg_popularity'],
+            mode='lines+markers',
+            name='Avg Popularity',
+            line=dict(color='#FF6B6B', width=2),
+            marker=dict(size=6)
+        ))
+        
+        fig_pop.update_layout(
+            title="Average Track Popularity Over Time",
+            xaxis_title="Date",
+            yaxis_title="Average Popularity Score",
+            hovermode='x unified',
+            height=400
+        )
+        
+        st.plotly_chart(fig_pop, use_container_width=True)
+        
+        # Growth metrics
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            total_growth = hist_df['saves'].iloc[-1] - hist_df['saves'].iloc[0]
+            st.metric("Total Growth", f"+{total_growth:,}")
+        with col2:
+            avg_daily_growth = hist_df['daily_growth'][1:].mean()
+            st.metric("Avg Daily Growth", f"+{avg_daily_growth:.1f}")
+        with col3:
+            growth_rate = ((hist_df['saves'].iloc[-1] / hist_df['saves'].iloc[0]) - 1) * 100
+            st.metric("Overall Growth Rate", f"{growth_rate:.1f}%")
+        with col4:
+            days_tracked = len(hist_df)
+            st.metric("Days Tracked", days_tracked)
+        
+    else:
+        st.info("Growth tracking will be available after collecting data for multiple days. Check back tomorrow!")
+        st.metric("Current Saves", f"{playlist_info['followers']['total']:,}")
+
+# Track popularity tab
+@st.fragment
+def render_popularity_tab(tracks_df, track_stats):
+    st.header("Track Popularity Analysis")
     
-    # Add today's track popularity data
-    today_tracks = tracks_df[['track_id', 'name', 'artist', 'popularity']].copy()
-    today_tracks['date'] = today
+    # Top tracks by popularity
+    top_tracks = track_stats['top_tracks']
+    
+    fig_popularity = px.bar(
+        top_tracks,
+        x='popularity',
+        y='name',
+        orientation='h',
+        color='popularity',
+        color_continuous_scale='Viridis',
+        labels={'name': 'Track', 'popularity': 'Popularity Score'},
+        title="Top 20 Most Popular Tracks"
+    )
+    
+    fig_popularity.update_layout(
+        height=600,
+        showlegend=False,
+        yaxis={'categoryorder': 'total ascending'}
+    )
+    
+    st.plotly_chart(fig_popularity, use_container_width=True)
+    
+    # Track popularity changes over time (if we have historical data)
+    track_hist_df = load_track_history(get_mtime(TRACK_HISTORY_DIR))
+    if len(track_hist_df) > 0:
+        st.subheader("Track Popularity Trends")
+        
+        # Select tracks to analyze
+        selected_tracks = st.multiselect(
+            "Select tracks to view popularity trends",
+            options=tracks_df['name'].unique(),
+            default=top_tracks['name'].head(5).tolist()
+        )
+        
+        if selected_tracks:
+            # Filter historical data for selected tracks
+            trend_data = track_hist_df[track_hist_df['name'].isin(selected_tracks)]
+            
+            # Average long histories per week to keep the plot payload small
+            if trend_data['date'].nunique() > MAX_PLOT_POINTS:
+                trend_data = (
+                    trend_data.set_index('date')
+                    .groupby('name')['popularity']
+                    .resample('W').mean()
+                    .reset_index()
+                )
+            
+            fig_trends = px.line(
+                trend_data,
+                x='date',
+                y='popularity',
+                color='name',
+                title="Track Popularity Trends",
+                labels={'popularity': 'Popularity Score', 'name': 'Track'}
+            )
+            
+            fig_trends.update_layout(height=500)
+            st.plotly_chart(fig_trends, use_container_width=True)
     
-    track_hist_df = pd.concat([track_hist_df, today_tracks], ignore_index=True)
-    save_track_history(track_hist_df)
+    # Popularity distribution
+    fig_dist = px.histogram(
+        tracks_df,
+        x='popularity',
+        nbins=20,
+        title="Track Popularity Distribution",
+        labels={'popularity': 'Popularity Score', 'count': 'Number of Tracks'}
+    )
     
-    return hist_df, track_hist_df
+    fig_dist.update_layout(
+        showlegend=False,
+        bargap=0.1
+    )
+    
+    st.plotly_chart(fig_dist, use_container_width=True)
+
+# Playlist analysis tab
+@st.fragment
+def render_analysis_tab(tracks_df, track_stats):
+    st.header("Playlist Analysis")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Artists with most tracks
+        artist_counts = track_stats['artist_counts']
+        
+        fig_artists = px.pie(
+            values=artist_counts.values,
+            names=artist_counts.index,
+            title="Top 15 Artists by Track Count"
+        )
+        
+        st.plotly_chart(fig_artists, use_container_width=True)
+    
+    with col2:
+        # Average track duration
+        fig_duration = px.box(
+            tracks_df,
+            y='duration_min',
+            title="Track Duration Distribution",
+            labels={'duration_min': 'Duration (minutes)'}
+        )
+        
+        st.plotly_chart(fig_duration, use_container_width=True)
+    
+    # Release date analysis
+    year_counts = track_stats['year_counts']
+    
+    fig_years = px.line(
+        x=year_counts.index,
+        y=year_counts.values,
+        title="Tracks by Release Year",
+        labels={'x': 'Year', 'y': 'Number of Tracks'}
+    )
+    
+    fig_years.update_traces(mode='lines+markers')
+    st.plotly_chart(fig_years, use_container_width=True)
+
+# Track details tab
+@st.fragment
+def render_details_tab(tracks_df):
+    st.header("Track Details")
+    
+    # Search functionality
+    search_term = st.text_input("Search tracks by name or artist", "")
+    
+    if search_term:
+        filtered_df = tracks_df[tracks_df['_search'].str.contains(search_term.lower(), regex=False)]
+    else:
+        filtered_df = tracks_df
+    
+    # Sort options
+    sort_by = st.selectbox(
+        "Sort by",
+        ["Popularity", "Track Name", "Artist", "Release Date"]
+    )
+    
+    sort_mapping = {
+        "Popularity": "popularity",
+        "Track Name": "name",
+        "Artist": "artist",
+        "Release Date": "release_date"
+    }
+    
+    ascending = sort_by != "Popularity"
+    filtered_df = filtered_df.sort_values(sort_mapping[sort_by], ascending=ascending)
+    
+    # Display tracks
+    st.dataframe(
+        filtered_df[['name', 'artist', 'album', 'popularity', 'release_date']],
+        use_container_width=True,
+        height=600
+    )
+
+# Data export tab
+@st.fragment
+def render_export_tab(tracks_df):
+    st.header("Export Historical Data")
+    history_mtime = get_mtime(HISTORY_DIR)
+    track_history_mtime = get_mtime(TRACK_HISTORY_DIR)
+    hist_df = load_historical_data(history_mtime)
+    track_hist_df = load_track_history(track_history_mtime)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Playlist Statistics History")
+        if not hist_df.empty:
+            st.dataframe(hist_df, use_container_width=True)
+            csv1 = get_history_csv(history_mtime)
+            st.download_button(
+                label="Download Playlist History CSV",
+                data=csv1,
+                file_name=f"playlist_history_{datetime.now().strftime('%Y%m%d')}.csv",
+                mime="text/csv"
+            )
+        else:
+            st.info("No historical data available yet")
+    
+    with col2:
+        st.subheader("Current Track Data")
+        csv2 = tracks_df.drop(columns='_search').to_csv(index=False)
+        st.download_button(
+            label="Download Current Tracks CSV",
+            data=csv2,
+            file_name=f"current_tracks_{datetime.now().strftime('%Y%m%d')}.csv",
+            mime="text/csv"
+        )
+        
+        if not track_hist_df.empty:
+            st.subheader("Track Popularity History")
+            # Show summary of track history
+            track_summary = get_track_summary(track_history_mtime)
+            
+            st.dataframe(track_summary, use_container_width=True)
+            
+            csv3 = get_track_history_csv(track_history_mtime)
+            st.download_button(
+                label="Download Track Popularity History CSV",
+                data=csv3,
+                file_name=f"track_popularity_history_{datetime.now().strftime('%Y%m%d')}.csv",
+                mime="text/csv"
+            )
 
 # Main app
 def main():
@@ -130,13 +596,13 @@ def main():
     
     # Get playlist data
     try:
-        playlist_info, tracks_df = get_playlist_data(sp, playlist_id)
+        playlist_info, tracks_df, track_stats = get_playlist_data(sp, playlist_id)
     except Exception as e:
         st.error(f"Failed to fetch playlist data: {str(e)}")
         st.stop()
     
     # Update daily statistics
-    hist_df, track_hist_df = update_daily_stats(playlist_info, tracks_df)
+    update_daily_stats(playlist_info, tracks_df)
     
     # Display playlist info
     col1, col2, col3, col4 = st.columns(4)
@@ -149,308 +615,24 @@ def main():
     with col4:
         st.metric("Owner", playlist_info['owner']['display_name'])
     
-    # Tabs for different views
+    # Tabs for different views - each tab is a fragment, so interacting with
+    # a widget only reruns the tab it lives in
     tab1, tab2, tab3, tab4, tab5 = st.tabs(["📈 Growth Tracking", "🎯 Track Popularity", "📊 Playlist Analysis", "🎵 Track Details", "📁 Data Export"])
     
     with tab1:
-        st.header("Playlist Growth Over Time")
-        
-        if len(hist_df) > 1:
-            # Calculate daily changes
-            hist_df = hist_df.sort_values('date')
-            hist_df['daily_growth'] = hist_df['saves'].diff().fillna(0)
-            hist_df['growth_rate'] = (hist_df['saves'].pct_change() * 100).fillna(0)
-            
-            # Create subplots
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Line chart for saves
-                fig_saves = go.Figure()
-                fig_saves.add_trace(go.Scatter(
-                    x=hist_df['date'],
-                    y=hist_df['saves'],
-                    mode='lines+markers',
-                    name='Total Saves',
-                    line=dict(color='#1DB954', width=3),
-                    marker=dict(size=8)
-                ))
-                
-                fig_saves.update_layout(
-                    title="Total Playlist Saves",
-                    xaxis_title="Date",
-                    yaxis_title="Total Saves",
-                    hovermode='x unified',
-                    height=400
-                )
-                
-                st.plotly_chart(fig_saves, use_container_width=True)
-            
-            with col2:
-                # Bar chart for daily growth
-                fig_growth = go.Figure()
-                fig_growth.add_trace(go.Bar(
-                    x=hist_df['date'],
-                    y=hist_df['daily_growth'],
-                    name='Daily Growth',
-                    marker_color=hist_df['daily_growth'].apply(lambda x: '#1DB954' if x >= 0 else '#FF6B6B')
-                ))
-                
-                fig_growth.update_layout(
-                    title="Daily Save Growth",
-                    xaxis_title="Date",
-                    yaxis_title="New Saves",
-                    height=400
-                )
-                
-                st.plotly_chart(fig_growth, use_container_width=True)
-            
-            # Average popularity over time
-            fig_pop = go.Figure()
-            fig_pop.add_trace(go.Scatter(
-                x=hist_df['date'],
-                y=hist_df['avg_popularity'],
-                mode='lines+markers',
-                name='Avg Popularity',
-                line=dict(color='#FF6B6B', width=2),
-                marker=dict(size=6)
-            ))
-            
-            fig_pop.update_layout(
-                title="Average Track Popularity Over Time",
-                xaxis_title="Date",
-                yaxis_title="Average Popularity Score",
-                hovermode='x unified',
-                height=400
-            )
-            
-            st.plotly_chart(fig_pop, use_container_width=True)
-            
-            # Growth metrics
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                total_growth = hist_df['saves'].iloc[-1] - hist_df['saves'].iloc[0]
-                st.metric("Total Growth", f"+{total_growth:,}")
-            with col2:
-                avg_daily_growth = hist_df['daily_growth'][1:].mean()
-                st.metric("Avg Daily Growth", f"+{avg_daily_growth:.1f}")
-            with col3:
-                growth_rate = ((hist_df['saves'].iloc[-1] / hist_df['saves'].iloc[0]) - 1) * 100
-                st.metric("Overall Growth Rate", f"{growth_rate:.1f}%")
-            with col4:
-                days_tracked = len(hist_df)
-                st.metric("Days Tracked", days_tracked)
-            
-        else:
-            st.info("Growth tracking will be available after collecting data for multiple days. Check back tomorrow!")
-            st.metric("Current Saves", f"{playlist_info['followers']['total']:,}")
+        render_growth_tab(playlist_info)
     
     with tab2:
-        st.header("Track Popularity Analysis")
-        
-        # Top tracks by popularity
-        top_tracks = tracks_df.nlargest(20, 'popularity')
-        
-        fig_popularity = px.bar(
-            top_tracks,
-            x='popularity',
-            y='name',
-            orientation='h',
-            color='popularity',
-            color_continuous_scale='Viridis',
-            labels={'name': 'Track', 'popularity': 'Popularity Score'},
-            title="Top 20 Most Popular Tracks"
-        )
-        
-        fig_popularity.update_layout(
-            height=600,
-            showlegend=False,
-            yaxis={'categoryorder': 'total ascending'}
-        )
-        
-        st.plotly_chart(fig_popularity, use_container_width=True)
-        
-        # Track popularity changes over time (if we have historical data)
-        if len(track_hist_df) > 0:
-            st.subheader("Track Popularity Trends")
-            
-            # Select tracks to analyze
-            selected_tracks = st.multiselect(
-                "Select tracks to view popularity trends",
-                options=tracks_df['name'].unique(),
-                default=top_tracks['name'].head(5).tolist()
-            )
-            
-            if selected_tracks:
-                # Filter historical data for selected tracks
-                trend_data = track_hist_df[track_hist_df['name'].isin(selected_tracks)]
-                
-                fig_trends = px.line(
-                    trend_data,
-                    x='date',
-                    y='popularity',
-                    color='name',
-                    title="Track Popularity Trends",
-                    labels={'popularity': 'Popularity Score', 'name': 'Track'}
-                )
-                
-                fig_trends.update_layout(height=500)
-                st.plotly_chart(fig_trends, use_container_width=True)
-        
-        # Popularity distribution
-        fig_dist = px.histogram(
-            tracks_df,
-            x='popularity',
-            nbins=20,
-            title="Track Popularity Distribution",
-            labels={'popularity': 'Popularity Score', 'count': 'Number of Tracks'}
-        )
-        
-        fig_dist.update_layout(
-            showlegend=False,
-            bargap=0.1
-        )
-        
-        st.plotly_chart(fig_dist, use_container_width=True)
+        render_popularity_tab(tracks_df, track_stats)
     
     with tab3:
-        st.header("Playlist Analysis")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Artists with most tracks
-            artist_counts = tracks_df['artist'].value_counts().head(15)
-            
-            fig_artists = px.pie(
-                values=artist_counts.values,
-                names=artist_counts.index,
-                title="Top 15 Artists by Track Count"
-            )
-            
-            st.plotly_chart(fig_artists, use_container_width=True)
-        
-        with col2:
-            # Average track duration
-            tracks_df['duration_min'] = tracks_df['duration_ms'] / 60000
-            
-            fig_duration = px.box(
-                tracks_df,
-                y='duration_min',
-                title="Track Duration Distribution",
-                labels={'duration_min': 'Duration (minutes)'}
-            )
-            
-            st.plotly_chart(fig_duration, use_container_width=True)
-        
-        # Release date analysis - handle different date formats
-        def extract_year(date_str):
-            if pd.isna(date_str):
-                return None
-            # If it's just a year (4 digits)
-            if len(str(date_str)) == 4:
-                return int(date_str)
-            # If it's YYYY-MM or YYYY-MM-DD
-            else:
-                return int(str(date_str).split('-')[0])
-        
-        tracks_df['release_year'] = tracks_df['release_date'].apply(extract_year)
-        # Filter out None values before counting
-        year_counts = tracks_df['release_year'].dropna().value_counts().sort_index()
-        
-        fig_years = px.line(
-            x=year_counts.index,
-            y=year_counts.values,
-            title="Tracks by Release Year",
-            labels={'x': 'Year', 'y': 'Number of Tracks'}
-        )
-        
-        fig_years.update_traces(mode='lines+markers')
-        st.plotly_chart(fig_years, use_container_width=True)
+        render_analysis_tab(tracks_df, track_stats)
     
     with tab4:
-        st.header("Track Details")
-        
-        # Search functionality
-        search_term = st.text_input("Search tracks by name or artist", "")
-        
-        if search_term:
-            filtered_df = tracks_df[
-                tracks_df['name'].str.contains(search_term, case=False) |
-                tracks_df['artist'].str.contains(search_term, case=False)
-            ]
-        else:
-            filtered_df = tracks_df
-        
-        # Sort options
-        sort_by = st.selectbox(
-            "Sort by",
-            ["Popularity", "Track Name", "Artist", "Release Date"]
-        )
-        
-        sort_mapping = {
-            "Popularity": "popularity",
-            "Track Name": "name",
-            "Artist": "artist",
-            "Release Date": "release_date"
-        }
-        
-        ascending = sort_by != "Popularity"
-        filtered_df = filtered_df.sort_values(sort_mapping[sort_by], ascending=ascending)
-        
-        # Display tracks
-        st.dataframe(
-            filtered_df[['name', 'artist', 'album', 'popularity', 'release_date']],
-            use_container_width=True,
-            height=600
-        )
+        render_details_tab(tracks_df)
     
     with tab5:
-        st.header("Export Historical Data")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("Playlist Statistics History")
-            if not hist_df.empty:
-                st.dataframe(hist_df, use_container_width=True)
-                csv1 = hist_df.to_csv(index=False)
-                st.download_button(
-                    label="Download Playlist History CSV",
-                    data=csv1,
-                    file_name=f"playlist_history_{datetime.now().strftime('%Y%m%d')}.csv",
-                    mime="text/csv"
-                )
-            else:
-                st.info("No historical data available yet")
-        
-        with col2:
-            st.subheader("Current Track Data")
-            csv2 = tracks_df.to_csv(index=False)
-            st.download_button(
-                label="Download Current Tracks CSV",
-                data=csv2,
-                file_name=f"current_tracks_{datetime.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv"
-            )
-            
-            if not track_hist_df.empty:
-                st.subheader("Track Popularity History")
-                # Show summary of track history
-                track_summary = track_hist_df.groupby('date').agg({
-                    'track_id': 'count',
-                    'popularity': 'mean'
-                }).rename(columns={'track_id': 'tracks_count', 'popularity': 'avg_popularity'})
-                
-                st.dataframe(track_summary, use_container_width=True)
-                
-                csv3 = track_hist_df.to_csv(index=False)
-                st.download_button(
-                    label="Download Track Popularity History CSV",
-                    data=csv3,
-                    file_name=f"track_popularity_history_{datetime.now().strftime('%Y%m%d')}.csv",
-                    mime="text/csv"
-                )
+        render_export_tab(tracks_df)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file